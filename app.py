@@ -21,6 +21,7 @@ Main Components:
 
 Session State Variables:
     temp_pdf_paths (list): Stores paths of temporarily uploaded PDFs
+    temp_dir (str): Per-session temporary directory holding the uploaded PDFs, created on first upload
     chatbot_manager (ChatbotManager): Instance of the chatbot manager
     messages (list): Stores chat history for the interview assistant
     selected_candidates (list): Stores information about selected candidates
@@ -52,12 +53,13 @@ The application is organized into four main sections:
 
 Each section is conditionally rendered based on the current_page session state.
 """
-import streamlit as st
+import atexit
+import os
+import shutil
+import tempfile
+import threading
 import time
-import base64
-import requests
-from vectors import EmbeddingsManager
-from chatbot import ChatbotManager
+import streamlit as st
 
 # Set page configuration
 st.set_page_config(
@@ -98,15 +100,119 @@ def display_pdf(file):
         None
 
     Note:
-        Displays the PDF using an HTML iframe with base64 encoding
+        Uses Streamlit's native PDF viewer, which serves the file instead of inlining
+        it into the page as a base64 data URI
+    """
+    # The upload was already streamed to disk, so rewind before handing it over
+    file.seek(0)
+    st.pdf(file, height=500)
+
+@st.cache_resource(show_spinner=False)
+def get_upload_root() -> str:
+    """
+    Create the process-wide parent directory of every session's uploads.
+
+    The directory, and every session directory inside it, is removed when the
+    server process exits, so uploaded CVs don't pile up in the temp folder.
+
+    Returns:
+        str: Path of the parent upload directory
+    """
+    upload_root = tempfile.mkdtemp(prefix="el_fahman_")
+    atexit.register(shutil.rmtree, upload_root, ignore_errors=True)
+    return upload_root
+
+@st.cache_resource(show_spinner=False)
+def get_collection_state() -> dict:
+    """
+    Get the process-wide version of the shared 'vector_db' collection.
+
+    The collection is shared by every session, so its version must be too; otherwise
+    two sessions could reach the same version number for different contents.
+
+    Returns:
+        dict: {"version": int, "lock": threading.Lock}
     """
-    base64_pdf = base64.b64encode(file.read()).decode('utf-8')
-    pdf_display = f'<iframe src="data:application/pdf;base64,{base64_pdf}" width="100%" height="500" type="application/pdf"></iframe>'
-    st.markdown(pdf_display, unsafe_allow_html=True)
+    return {"version": 0, "lock": threading.Lock()}
+
+def get_collection_version() -> int:
+    """
+    Get the current version of the shared collection.
+
+    Returns:
+        int: Version number, bumped whenever the collection's contents change
+    """
+    state = get_collection_state()
+    with state["lock"]:
+        return state["version"]
+
+def bump_collection_version():
+    """
+    Mark the shared collection as changed, invalidating cached responses.
+
+    Returns:
+        None
+    """
+    state = get_collection_state()
+    with state["lock"]:
+        state["version"] += 1
+
+@st.cache_resource(show_spinner=False)
+def get_response_cache() -> dict:
+    """
+    Get the process-wide cache of completed chatbot responses.
+
+    Returns:
+        dict: {"entries": dict, "lock": threading.Lock}, where entries maps
+            (collection_version, query) to (created_at, response), oldest first
+    """
+    return {"entries": {}, "lock": threading.Lock()}
+
+def stream_response(collection_version: int, query: str, max_cached: int = 256, ttl: float = 3600):
+    """
+    Stream the chatbot's response to a query, memoized per collection version.
+
+    Cached answers are yielded in one piece; otherwise tokens are yielded as the
+    language model produces them and the full answer is cached once complete.
+
+    Args:
+        collection_version (int): Version of the vector database the answer is based on;
+            bumping it invalidates previously cached answers
+        query (str): Query to send to the chatbot
+        max_cached (int): Maximum number of responses kept; the oldest are evicted first
+        ttl (float): Number of seconds a cached response stays valid
+
+    Yields:
+        str: Chunks of the chatbot's response
+    """
+    cache = get_response_cache()
+    key = (collection_version, query)
+    with cache["lock"]:
+        entry = cache["entries"].get(key)
+    if entry and time.monotonic() - entry[0] < ttl:
+        yield entry[1]
+        return
+
+    chunks = []
+    for chunk in st.session_state['chatbot_manager'].stream_response(query):
+        chunks.append(chunk)
+        yield chunk
+
+    with cache["lock"]:
+        entries = cache["entries"]
+        now = time.monotonic()
+        entries.pop(key, None)
+        entries[key] = (now, "".join(chunks))
+        for expired in [k for k, (created_at, _) in entries.items() if now - created_at >= ttl]:
+            del entries[expired]
+        while len(entries) > max_cached:
+            entries.pop(next(iter(entries)))
 
 # Initialize session state
 if 'temp_pdf_paths' not in st.session_state:
     st.session_state['temp_pdf_paths'] = []
+if 'temp_dir' not in st.session_state:
+    st.session_state['temp_dir'] = None
 if 'chatbot_manager' not in st.session_state:
     st.session_state['chatbot_manager'] = None
 if 'messages' not in st.session_state:
@@ -171,11 +277,19 @@ if st.session_state['current_page'] == 'upload':
         )
         
         if uploaded_files:
+            if not st.session_state['temp_dir']:
+                st.session_state['temp_dir'] = tempfile.mkdtemp(dir=get_upload_root())
+
+            # Start from a clean directory so replaced uploads don't linger on disk
+            shutil.rmtree(st.session_state['temp_dir'], ignore_errors=True)
+            os.makedirs(st.session_state['temp_dir'], exist_ok=True)
+
             st.session_state['temp_pdf_paths'] = []
             for uploaded_file in uploaded_files:
-                temp_pdf_path = f"{uploaded_file.name}"
+                temp_pdf_path = os.path.join(st.session_state['temp_dir'], uploaded_file.name)
+                uploaded_file.seek(0)
                 with open(temp_pdf_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
+                    shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
                 st.session_state['temp_pdf_paths'].append(temp_pdf_path)
             
             st.success(f"✅ {len(uploaded_files)} CV(s) uploaded successfully!")
@@ -194,6 +308,13 @@ if st.session_state['current_page'] == 'upload':
                     display_pdf(file)
 
 elif st.session_state['current_page'] == 'process':
+    # Heavy ML and vector database modules are only imported once a page needs them,
+    # keeping the upload page's first paint fast
+    import grpc
+    from vectors import EmbeddingsManager
+    from chatbot import ChatbotManager
+    from models import EMBEDDING_CACHE_DIR, get_embedding_cache, get_qdrant_client
+
     st.title("⚙️ Process & Analyze")
     
     process_col, col2 = st.columns([1, 1])
@@ -212,21 +333,26 @@ elif st.session_state['current_page'] == 'process':
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            for idx, pdf_path in enumerate(st.session_state['temp_pdf_paths']):
-                status_text.text(f"Processing: {pdf_path}")
-                embeddings_manager.create_embeddings(pdf_path)
-                progress = (idx + 1) / len(st.session_state['temp_pdf_paths'])
+            def update_progress(progress, status):
+                status_text.text(status)
                 progress_bar.progress(progress)
-                time.sleep(0.5)
+
+            indexed_count = embeddings_manager.create_embeddings(
+                st.session_state['temp_pdf_paths'],
+                progress_callback=update_progress
+            )
+            progress_bar.progress(1.0)
             
-            status_text.text("✅ Embeddings created successfully!")
             st.session_state['processing_status'] = 1
+            if indexed_count:
+                status_text.text(f"✅ {indexed_count} CV(s) embedded and stored in Qdrant!")
+                bump_collection_version()
+            else:
+                status_text.text("✅ All CVs are already stored in Qdrant!")
             
             # Initialize chatbot
             st.session_state['chatbot_manager'] = ChatbotManager(
                 model_name="BAAI/bge-small-en",
-                device="cpu",
-                encode_kwargs={"normalize_embeddings": True},
                 llm_model="llama3.2:3b",
                 llm_temperature=0.7,
                 qdrant_url="http://localhost:6333",
@@ -237,13 +363,19 @@ elif st.session_state['current_page'] == 'process':
         st.markdown("### 🗑️ Delete Database")
         if st.button("❌ Delete Vector Database", key="delete_db_button"):
             try:
-                response = requests.delete("http://localhost:6333/collections/vector_db")
-                if response.status_code == 200:
-                    st.success("✅ Collection 'vector_db' deleted successfully!")
-                elif response.status_code == 404:
+                # Reuse the shared, pooled Qdrant connection for admin operations
+                client = get_qdrant_client("http://localhost:6333")
+                if not client.collection_exists("vector_db"):
                     st.warning("⚠️ Collection 'vector_db' does not exist.")
                 else:
-                    st.error(f"❌ Failed to delete collection. Status code: {response.status_code}")
+                    client.delete_collection(collection_name="vector_db")
+                    bump_collection_version()
+                    st.success("✅ Collection 'vector_db' deleted successfully!")
+                # Cached chunk embeddings are derived from the CVs; drop them with the index
+                get_embedding_cache(EMBEDDING_CACHE_DIR).clear()
+            except grpc.RpcError as e:
+                # The shared client talks gRPC, so server-side failures surface as RpcError
+                st.error(f"❌ Failed to delete collection. Status code: {e.code()}")
             except Exception as e:
                 st.error(f"❌ Error while deleting collection: {e}")
     
@@ -257,13 +389,15 @@ elif st.session_state['current_page'] == 'process':
         if st.button("Find Top Candidates", disabled=not st.session_state['chatbot_manager']):
             st.session_state['user_requirements'] = requirements
             st.session_state['top_n'] = top_n
-            query = f"Select the top {top_n} candidates based on the following requirements: {requirements}"
             
             with st.spinner("🔍 Finding candidates..."):
                 try:
-                    result = st.session_state['chatbot_manager'].get_response(query)
-                    st.session_state['selected_candidates'] = result.split("\n")  # Save the candidates for display
-                    st.success(f"✅ Successfully found {top_n} candidates!")
+                    candidates = st.session_state['chatbot_manager'].select_top_candidates(requirements, top_n)
+                    st.session_state['selected_candidates'] = [
+                        f"{rank}. {candidate['candidate_name']} (match score: {candidate['score']:.2f})"
+                        for rank, candidate in enumerate(candidates, start=1)
+                    ]  # Save the candidates for display
+                    st.success(f"✅ Successfully found {len(candidates)} candidates!")
                 except Exception as e:
                     st.error(f"Error: {e}")
 
@@ -281,118 +415,138 @@ elif st.session_state['current_page'] == 'process':
 elif st.session_state['current_page'] == 'chat':
     st.title("💬 Interview Assistant")
     
-    chat_col, info_col = st.columns([2, 1])
+    @st.fragment
+    def chat_area():
+        """
+        Render the interview assistant chat and suggested questions.
+
+        Runs as a fragment, so sending a message or clicking a suggested question
+        only reruns this region instead of the whole app.
+        """
+        chat_col, info_col = st.columns([2, 1])
     
-    with chat_col:
-        st.markdown("### 🤖 Chat with AI Assistant")
+        with chat_col:
+            st.markdown("### 🤖 Chat with AI Assistant")
         
-        # Display chat history first
-        for message in st.session_state['messages']:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+            # Display chat history first
+            for message in st.session_state['messages']:
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
         
-        # Chat input
-        if prompt := st.chat_input("Ask about the selected candidates..."):
-            if st.session_state['chatbot_manager']:
-                st.chat_message("user").markdown(prompt)
-                st.session_state['messages'].append({"role": "user", "content": prompt})
+            # Chat input
+            if prompt := st.chat_input("Ask about the selected candidates..."):
+                if st.session_state['chatbot_manager']:
+                    st.chat_message("user").markdown(prompt)
+                    st.session_state['messages'].append({"role": "user", "content": prompt})
                 
-                with st.spinner("Thinking..."):
-                    context = "\n".join(st.session_state['selected_candidates'])
-                    query = f"Context: {context}\nQuestion: {prompt}"
-                    try:
-                        response = st.session_state['chatbot_manager'].get_response(query)
-                        st.chat_message("assistant").markdown(response)
-                        st.session_state['messages'].append({"role": "assistant", "content": response})
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-            else:
-                st.error("Please process CVs first!")
+                    with st.spinner("Thinking..."):
+                        context = "\n".join(st.session_state['selected_candidates'])
+                        query = f"Context: {context}\nQuestion: {prompt}"
+                        try:
+                            with st.chat_message("assistant"):
+                                response = st.write_stream(stream_response(get_collection_version(), query))
+                            st.session_state['messages'].append({"role": "assistant", "content": response})
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+                else:
+                    st.error("Please process CVs first!")
     
-    with info_col:
-        st.markdown("### 📋 Suggested Questions")
-        questions = [
-            "What are their key skills?",
-            "Compare their experience levels.",
-            "Who has the most relevant background?",
-            "Rate their technical expertise.",
-        ]
-        for question in questions:
-            if st.button(question, key=f"suggest_{question}"):
-                st.chat_message("user").markdown(question)
-                st.session_state['messages'].append({"role": "user", "content": question})
+        with info_col:
+            st.markdown("### 📋 Suggested Questions")
+            questions = [
+                "What are their key skills?",
+                "Compare their experience levels.",
+                "Who has the most relevant background?",
+                "Rate their technical expertise.",
+            ]
+            for question in questions:
+                if st.button(question, key=f"suggest_{question}"):
+                    st.chat_message("user").markdown(question)
+                    st.session_state['messages'].append({"role": "user", "content": question})
                 
-                with st.spinner("Thinking..."):
-                    context = "\n".join(st.session_state['selected_candidates'])
-                    query = f"Context: {context}\nQuestion: {question}"
-                    try:
-                        response = st.session_state['chatbot_manager'].get_response(query)
-                        st.chat_message("assistant").markdown(response)
-                        st.session_state['messages'].append({"role": "assistant", "content": response})
-                    except Exception as e:
-                        st.error(f"Error: {e}")
+                    with st.spinner("Thinking..."):
+                        context = "\n".join(st.session_state['selected_candidates'])
+                        query = f"Context: {context}\nQuestion: {question}"
+                        try:
+                            with st.chat_message("assistant"):
+                                response = st.write_stream(stream_response(get_collection_version(), query))
+                            st.session_state['messages'].append({"role": "assistant", "content": response})
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+
+    chat_area()
 
 elif st.session_state['current_page'] == 'explorer':
     st.title("🔍 CV Explorer")
     st.markdown("### Chat with All Uploaded CVs")
     
-    # Create two columns
-    chat_col, info_col = st.columns([2, 1])
+    @st.fragment
+    def explorer_chat_area():
+        """
+        Render the CV explorer chat, statistics and suggested questions.
+
+        Runs as a fragment, so sending a message or clicking a suggested question
+        only reruns this region instead of the whole app.
+        """
+        # Create two columns
+        chat_col, info_col = st.columns([2, 1])
     
-    with chat_col:
-        # Display chat history
-        for message in st.session_state['explorer_messages']:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
+        with chat_col:
+            # Display chat history
+            for message in st.session_state['explorer_messages']:
+                with st.chat_message(message["role"]):
+                    st.markdown(message["content"])
         
-        # Chat input
-        if prompt := st.chat_input("Ask anything about the CVs..."):
-            if st.session_state['chatbot_manager']:
-                # Show user message immediately
-                st.chat_message("user").markdown(prompt)
-                st.session_state['explorer_messages'].append({"role": "user", "content": prompt})
+            # Chat input
+            if prompt := st.chat_input("Ask anything about the CVs..."):
+                if st.session_state['chatbot_manager']:
+                    # Show user message immediately
+                    st.chat_message("user").markdown(prompt)
+                    st.session_state['explorer_messages'].append({"role": "user", "content": prompt})
                 
-                with st.spinner("Analyzing all CVs..."):
-                    # Create a query that includes all CVs
-                    query = f"Analyze all available CVs and answer: {prompt}"
-                    try:
-                        response = st.session_state['chatbot_manager'].get_response(query)
-                        # Show assistant response immediately
-                        st.chat_message("assistant").markdown(response)
-                        st.session_state['explorer_messages'].append({"role": "assistant", "content": response})
-                    except Exception as e:
-                        st.error(f"Error: {e}")
-            else:
-                st.error("Please process CVs first!")
+                    with st.spinner("Analyzing all CVs..."):
+                        # Create a query that includes all CVs
+                        query = f"Analyze all available CVs and answer: {prompt}"
+                        try:
+                            # Stream assistant response as it is generated
+                            with st.chat_message("assistant"):
+                                response = st.write_stream(stream_response(get_collection_version(), query))
+                            st.session_state['explorer_messages'].append({"role": "assistant", "content": response})
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+                else:
+                    st.error("Please process CVs first!")
     
-    with info_col:
-        st.markdown("### 📊 CV Statistics")
-        st.write(f"Total CVs: {len(st.session_state['temp_pdf_paths'])}")
+        with info_col:
+            st.markdown("### 📊 CV Statistics")
+            st.write(f"Total CVs: {len(st.session_state['temp_pdf_paths'])}")
         
-        st.markdown("### 💡 Suggested Questions")
-        example_questions = [
-            "List all candidates names with Machine Learning experience",
-            "Who has the most years of experience?",
-            "Summarize each CV in bullet points"
-        ]
+            st.markdown("### 💡 Suggested Questions")
+            example_questions = [
+                "List all candidates names with Machine Learning experience",
+                "Who has the most years of experience?",
+                "Summarize each CV in bullet points"
+            ]
         
-        for q in example_questions:
-            if st.button(q, key=f"explore_{q}"):
-                # Show user question immediately
-                st.chat_message("user").markdown(q)
-                st.session_state['explorer_messages'].append({"role": "user", "content": q})
+            for q in example_questions:
+                if st.button(q, key=f"explore_{q}"):
+                    # Show user question immediately
+                    st.chat_message("user").markdown(q)
+                    st.session_state['explorer_messages'].append({"role": "user", "content": q})
                 
-                with st.spinner("Analyzing all CVs..."):
-                    query = f"Analyze all available CVs and answer: {q}"
-                    try:
-                        response = st.session_state['chatbot_manager'].get_response(query)
-                        # Show assistant response immediately
-                        st.chat_message("assistant").markdown(response)
-                        st.session_state['explorer_messages'].append({"role": "assistant", "content": response})
-                    except Exception as e:
-                        st.error(f"Error: {e}")
+                    with st.spinner("Analyzing all CVs..."):
+                        query = f"Analyze all available CVs and answer: {q}"
+                        try:
+                            # Stream assistant response as it is generated
+                            with st.chat_message("assistant"):
+                                response = st.write_stream(stream_response(get_collection_version(), query))
+                            st.session_state['explorer_messages'].append({"role": "assistant", "content": response})
+                        except Exception as e:
+                            st.error(f"Error: {e}")
                         
-        # Add a clear chat button
-        if st.button("🗑️ Clear Chat History", key="clear_explorer_chat"):
-            st.session_state['explorer_messages'] = []
-            st.rerun()
+            # Add a clear chat button
+            if st.button("🗑️ Clear Chat History", key="clear_explorer_chat"):
+                st.session_state['explorer_messages'] = []
+                st.rerun(scope="fragment")
+
+    explorer_chat_area()
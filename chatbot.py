@@ -1,13 +1,11 @@
 # chatbot.py
 
 import os
-from langchain_community.embeddings import HuggingFaceBgeEmbeddings
 from langchain_community.vectorstores import Qdrant
-from langchain_ollama import ChatOllama
-from qdrant_client import QdrantClient
 from langchain import PromptTemplate
-from langchain.chains import RetrievalQA
 import streamlit as st
+from qdrant_client.http import models
+from models import DEVICE, get_embeddings, get_llm, get_qdrant_client
 
 class ChatbotManager:
     """
@@ -25,17 +23,18 @@ class ChatbotManager:
         llm_temperature (float): Temperature parameter for response generation
         qdrant_url (str): URL of the Qdrant vector database
         collection_name (str): Name of the vector database collection
+        search_params: Qdrant search parameters used for quantized retrieval
         embeddings: HuggingFace embeddings model instance
         llm: Local language model instance
         client: Qdrant client instance
         db: Vector store instance
-        qa: RetrievalQA chain instance
+        retriever: MMR retriever over the vector store
     """
     def __init__(
         self,
         model_name: str = "BAAI/bge-small-en",
-        device: str = "cpu",
-        encode_kwargs: dict = {"normalize_embeddings": True},
+        device: str = DEVICE,
+        encode_kwargs: dict = {"normalize_embeddings": True, "batch_size": 64},
         llm_model: str = "llama3.2:3b",
         llm_temperature: float = 0.7,
         qdrant_url: str = "http://localhost:6333",
@@ -49,9 +48,9 @@ class ChatbotManager:
             model_name (str): HuggingFace model name for embeddings.
                 Defaults to "BAAI/bge-small-en".
             device (str): Computing device ('cpu' or 'cuda').
-                Defaults to "cpu".
+                Defaults to "cuda" when available, otherwise "cpu".
             encode_kwargs (dict): Embedding encoding parameters.
-                Defaults to {"normalize_embeddings": True}.
+                Defaults to {"normalize_embeddings": True, "batch_size": 64}.
             llm_model (str): Local LLM model name.
                 Defaults to "llama3.2:3b".
             llm_temperature (float): Temperature for response generation.
@@ -75,18 +74,12 @@ class ChatbotManager:
         self.collection_name = collection_name
 
         # Initialize Embeddings
-        self.embeddings = HuggingFaceBgeEmbeddings(
-            model_name=self.model_name,
-            model_kwargs={"device": self.device},
-            encode_kwargs=self.encode_kwargs,
+        self.embeddings = get_embeddings(
+            self.model_name, self.device, self.encode_kwargs
         )
 
         # Initialize Local LLM
-        self.llm = ChatOllama(
-            model=self.llm_model,
-            temperature=self.llm_temperature,
-            # Add other parameters if needed
-        )
+        self.llm = get_llm(self.llm_model, self.llm_temperature)
 
         # Enhanced prompt template for CV analysis
         self.prompt_template = """You are an expert HR professional and talent acquisition specialist. 
@@ -111,9 +104,7 @@ class ChatbotManager:
         """
 
         # Initialize Qdrant client
-        self.client = QdrantClient(
-            url=self.qdrant_url, prefer_grpc=False
-        )
+        self.client = get_qdrant_client(self.qdrant_url)
 
         # Initialize the Qdrant vector store
         self.db = Qdrant(
@@ -128,28 +119,29 @@ class ChatbotManager:
             input_variables=['context', 'question']
         )
 
-        # Initialize the retriever
-        self.retriever = self.db.as_retriever(search_kwargs={"k": 5})
-
-        # Define chain type kwargs
-        self.chain_type_kwargs = {"prompt": self.prompt}
-
-        # Initialize the RetrievalQA chain with return_source_documents=False
-        self.qa = RetrievalQA.from_chain_type(
-            llm=self.llm,
-            chain_type="stuff",
-            retriever=self.retriever,
-            return_source_documents=False,  # Set to False to return only 'result'
-            chain_type_kwargs=self.chain_type_kwargs,
-            verbose=False
+        # Search quantized vectors with oversampling, then rescore with the originals;
+        # ignored by Qdrant for collections stored without quantization
+        self.search_params = models.SearchParams(
+            quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0)
         )
 
+        # Initialize the retriever; MMR keeps the 3 stuffed chunks diverse while
+        # keeping the LLM prompt short
+        self.retriever = self.db.as_retriever(
+            search_type="mmr",
+            search_kwargs={
+                "k": 3,
+                "fetch_k": 20,
+                "lambda_mult": 0.5,
+                "search_params": self.search_params,
+            }
+        )
 
     def get_response(self, query: str) -> str:
         """
         Generate a response to a user query about CV information.
 
-        This method processes the user's query through the QA chain, which:
+        This method collects the full output of `stream_response`, which:
         1. Retrieves relevant information from the vector store
         2. Formats the query with the specialized HR prompt
         3. Generates a detailed response using the language model
@@ -163,8 +155,76 @@ class ChatbotManager:
         Raises:
             RuntimeError: If there's an error processing the request
         """
+        return "".join(self.stream_response(query))
+
+    def stream_response(self, query: str):
+        """
+        Generate a response to a user query about CV information, token by token.
+
+        The retrieved chunks, each labelled with its candidate's name, are "stuffed" into
+        the prompt and tokens are yielded as soon as the language model produces them:
+        1. Retrieves relevant information from the vector store
+        2. Formats the query with the specialized HR prompt
+        3. Streams the response from the language model
+
+        Args:
+            query (str): User's question about CV information
+
+        Yields:
+            str: Successive chunks of the response
+
+        Raises:
+            RuntimeError: If there's an error processing the request
+        """
+        try:
+            docs = self.retriever.invoke(query)
+            context = "\n\n".join(
+                f"Candidate Name is {doc.metadata.get('candidate_name', 'unknown')}\n\n{doc.page_content}"
+                for doc in docs
+            )
+            prompt_text = self.prompt.format(context=context, question=query)
+            for chunk in self.llm.stream(prompt_text):
+                yield chunk.content
+        except Exception as e:
+            raise RuntimeError(f"Error processing request: {e}")
+
+    def select_top_candidates(self, requirements: str, top_n: int) -> list[dict]:
+        """
+        Rank candidates against job requirements using vector similarity alone.
+
+        This method skips the language model entirely:
+        1. Retrieves the chunks most similar to the requirements from the vector store
+        2. Groups the hits by candidate, keeping each candidate's best score
+        3. Returns the highest scoring candidates
+
+        Args:
+            requirements (str): Description of the ideal candidate profile
+            top_n (int): Number of candidates to return
+
+        Returns:
+            list[dict]: Up to `top_n` dicts with "candidate_name" and "score" keys,
+                sorted from best to worst match
+
+        Raises:
+            RuntimeError: If there's an error querying the vector store
+        """
         try:
-            response = self.qa.run(query)
-            return response
+            results = self.db.similarity_search_with_score(
+                requirements, k=top_n * 8, search_params=self.search_params
+            )
         except Exception as e:
             raise RuntimeError(f"Error processing request: {e}")
+
+        best_scores = {}
+        for doc, score in results:
+            candidate_name = doc.metadata.get("candidate_name")
+            if candidate_name is None:
+                continue
+            if score > best_scores.get(candidate_name, float("-inf")):
+                best_scores[candidate_name] = score
+
+        ranked = sorted(best_scores.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {"candidate_name": candidate_name, "score": score}
+            for candidate_name, score in ranked[:top_n]
+        ]
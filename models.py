@@ -0,0 +1,104 @@
+# models.py
+
+"""
+Shared, process-wide resources for the El-Fahman Bot.
+
+Streamlit reruns the whole script on every widget interaction, so heavyweight objects
+(embedding models, LLM clients, Qdrant connections) are built through the factories in
+this module, which are cached with `st.cache_resource` and shared across reruns,
+sessions, and both the EmbeddingsManager and the ChatbotManager.
+"""
+import diskcache
+import streamlit as st
+import torch
+from langchain_community.embeddings import HuggingFaceBgeEmbeddings
+from langchain_ollama import ChatOllama
+from qdrant_client import QdrantClient
+
+# Run the embedding model on the GPU whenever one is available
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+# On-disk cache of chunk embeddings, relative to the working directory
+EMBEDDING_CACHE_DIR = "./.emb_cache"
+
+
+@st.cache_resource(show_spinner=False)
+def get_embeddings(model_name: str, device: str, encode_kwargs: dict) -> HuggingFaceBgeEmbeddings:
+    """
+    Load a HuggingFace BGE embedding model once and reuse it across reruns.
+
+    On CUDA the model weights are loaded in float16, which halves their memory and
+    lets the GPU use its half-precision throughput; on CPU they stay in float32.
+
+    Args:
+        model_name (str): HuggingFace model name for embeddings generation
+        device (str): Computing device to use ('cpu' or 'cuda')
+        encode_kwargs (dict): Additional encoding parameters
+
+    Returns:
+        HuggingFaceBgeEmbeddings: The cached embeddings instance
+    """
+    return HuggingFaceBgeEmbeddings(
+        model_name=model_name,
+        model_kwargs={
+            "device": device,
+            "model_kwargs": {
+                "torch_dtype": torch.float16 if device == "cuda" else torch.float32
+            },
+        },
+        encode_kwargs=encode_kwargs,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_cache(cache_dir: str) -> diskcache.Cache:
+    """
+    Open the on-disk cache of chunk embeddings once and reuse it across reruns.
+
+    Args:
+        cache_dir (str): Directory of the cache
+
+    Returns:
+        diskcache.Cache: The cached, thread-safe cache handle
+    """
+    return diskcache.Cache(cache_dir)
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm(model: str, temperature: float) -> ChatOllama:
+    """
+    Create a ChatOllama client once and reuse it across reruns.
+
+    Args:
+        model (str): Local LLM model name
+        temperature (float): Temperature for response generation
+
+    Returns:
+        ChatOllama: The cached language model client
+    """
+    return ChatOllama(
+        model=model,
+        temperature=temperature,
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def get_qdrant_client(url: str) -> QdrantClient:
+    """
+    Open a connection to Qdrant once and reuse it across reruns.
+
+    The client talks gRPC over a persistent, keepalive'd HTTP/2 channel on port 6334,
+    which avoids the per-request JSON and connection overhead of the REST API.
+
+    Args:
+        url (str): URL of the Qdrant server
+
+    Returns:
+        QdrantClient: The cached Qdrant client
+    """
+    return QdrantClient(
+        url=url,
+        prefer_grpc=True,
+        grpc_port=6334,
+        grpc_options={"grpc.keepalive_time_ms": 30000},
+    )
@@ -0,0 +1,24 @@
+# pdf_text.py
+
+"""
+PyMuPDF text extraction for CV ingest.
+
+PyMuPDF does not support multithreading, so the EmbeddingsManager runs this function
+in separate worker processes. It lives in its own module so that spawned workers only
+import fitz, not the embedding model or Streamlit.
+"""
+import fitz
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """
+    Extract the plain text of every page of a PDF document.
+
+    Args:
+        pdf_path (str): Path to the PDF document
+
+    Returns:
+        str: The text of all pages, joined by newlines
+    """
+    with fitz.open(pdf_path) as pdf:
+        return "\n".join(page.get_text("text") for page in pdf)
@@ -1,14 +1,22 @@
 # vectors.py
 
 import os
-import base64
+import hashlib
+import multiprocessing
 import uuid
-from langchain_community.document_loaders import UnstructuredPDFLoader
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from langchain_community.embeddings import HuggingFaceBgeEmbeddings
-from langchain_community.vectorstores import Qdrant
-import requests
 from qdrant_client.http import models
+from models import (
+    DEVICE,
+    EMBEDDING_CACHE_DIR,
+    get_embedding_cache,
+    get_embeddings,
+    get_qdrant_client,
+)
+from pdf_text import extract_pdf_text
 
 
 
@@ -25,15 +33,30 @@ class EmbeddingsManager:
         encode_kwargs (dict): Additional encoding parameters
         qdrant_url (str): URL of the Qdrant server
         collection_name (str): Name of the collection in Qdrant
+        upsert_batch_size (int): Number of points sent to Qdrant per upsert request
+        min_text_chars (int): Minimum extracted text length before falling back to OCR-capable loading
+        max_workers (int): Maximum number of processes used to extract PDF text concurrently
+        cache_dir (str): Directory of the on-disk cache of chunk embeddings
+        quantization (str): Quantization of the stored vectors ("int8", "binary" or None)
         embeddings: HuggingFaceBgeEmbeddings instance for creating embeddings
     """
+    # Share of the progress bar given to each ingest stage; text extraction is cheap
+    # compared to embedding and uploading the chunks
+    EXTRACT_PROGRESS = 0.2
+    EMBED_PROGRESS = 0.8
+
     def __init__(
         self,
         model_name: str = "BAAI/bge-small-en",
-        device: str = "cpu",
-        encode_kwargs: dict = {"normalize_embeddings": True},
+        device: str = DEVICE,
+        encode_kwargs: dict = {"normalize_embeddings": True, "batch_size": 64},
         qdrant_url: str = "http://localhost:6333",
-        collection_name: str = f"vector_db{uuid.uuid4().hex}",
+        collection_name: str = "vector_db",
+        upsert_batch_size: int = 256,
+        min_text_chars: int = 100,
+        max_workers: int = 8,
+        cache_dir: str = EMBEDDING_CACHE_DIR,
+        quantization: Optional[str] = "int8",
     ):
         """
         Initialize the EmbeddingsManager with specified parameters.
@@ -42,85 +65,430 @@ class EmbeddingsManager:
             model_name (str): HuggingFace model name for embeddings generation.
                 Defaults to "BAAI/bge-small-en".
             device (str): Computing device to use ('cpu' or 'cuda').
-                Defaults to "cpu".
+                Defaults to "cuda" when available, otherwise "cpu".
             encode_kwargs (dict): Additional encoding parameters.
-                Defaults to {"normalize_embeddings": True}.
+                Defaults to {"normalize_embeddings": True, "batch_size": 64}.
             qdrant_url (str): URL of the Qdrant server.
                 Defaults to "http://localhost:6333".
             collection_name (str): Name of the collection in Qdrant.
-                Defaults to a randomly generated name.
+                Defaults to "vector_db".
+            upsert_batch_size (int): Number of points sent to Qdrant per upsert request.
+                Defaults to 256.
+            min_text_chars (int): Minimum number of characters PyMuPDF must extract before
+                the PDF is treated as scanned and re-loaded with UnstructuredPDFLoader.
+                Defaults to 100.
+            max_workers (int): Maximum number of processes used to extract PDF text concurrently.
+                Defaults to 8.
+            cache_dir (str): Directory of the on-disk cache of chunk embeddings.
+                Defaults to "./.emb_cache".
+            quantization (str, optional): Quantization applied to the stored vectors when the
+                collection is created: "int8" (scalar), "binary", or None to keep float32.
+                Defaults to "int8".
 
         Returns:
             None
+
+        Raises:
+            ValueError: If `quantization` is not one of the supported values
         """
+        if quantization not in ("int8", "binary", None):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
         self.model_name = model_name
         self.device = device
         self.encode_kwargs = encode_kwargs
         self.qdrant_url = qdrant_url
         self.collection_name = collection_name
+        self.upsert_batch_size = upsert_batch_size
+        self.min_text_chars = min_text_chars
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.quantization = quantization
 
-        self.embeddings = HuggingFaceBgeEmbeddings(
-            model_name=self.model_name,
-            model_kwargs={"device": self.device},
-            encode_kwargs=self.encode_kwargs,
+        self.embeddings = get_embeddings(
+            self.model_name, self.device, self.encode_kwargs
         )
 
-    def create_embeddings(self, pdf_path: str):
+        # Chunk embeddings keyed by content hash, persisted across reruns. The key also
+        # covers everything that changes the vectors: the model, the device (which sets
+        # float16 on CUDA vs float32 on CPU) and the encoding options; batch_size only
+        # affects throughput, so it is left out.
+        encode_options = sorted(
+            (key, value) for key, value in self.encode_kwargs.items() if key != "batch_size"
+        )
+        self._cache_namespace = f"{self.model_name}\0{self.device}\0{encode_options!r}"
+        self._vec_cache = get_embedding_cache(self.cache_dir)
+
+    def _quantization_config(self):
         """
-        Process a PDF document, create embeddings, and store them in Qdrant.
+        Build the Qdrant quantization config matching `quantization`.
 
-        This method performs the following steps:
-        1. Loads and validates the PDF document
-        2. Extracts the candidate's name from the filename
-        3. Splits the document into manageable chunks
-        4. Adds candidate information to each chunk
-        5. Creates embeddings and stores them in Qdrant
+        Returns:
+            The scalar or binary quantization config, or None when vectors are kept in float32
+        """
+        if self.quantization == "int8":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True,
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+
+    def _cache_key(self, text: str) -> bytes:
+        """
+        Hash a chunk's text, together with the embedding settings, into an embedding cache key.
+
+        Args:
+            text (str): Text of the chunk
+
+        Returns:
+            bytes: 16-byte BLAKE2b digest
+        """
+        return hashlib.blake2b(
+            f"{self._cache_namespace}\0{text}".encode(), digest_size=16
+        ).digest()
+
+    def _embed_with_cache(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed texts, reusing cached vectors for chunks that were embedded before.
+
+        Only the cache misses are sent to the embedding model, in a single batched call,
+        and their vectors are stored back in the cache.
+
+        Args:
+            texts (list[str]): Texts to embed
+
+        Returns:
+            list[list[float]]: One vector per text, in the order of `texts`
+        """
+        keys = [self._cache_key(text) for text in texts]
+        vectors = [self._vec_cache.get(key) for key in keys]
+
+        # Deduplicate misses so repeated chunks in the same batch are embedded once
+        misses = {}
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                misses.setdefault(key, text)
+
+        if misses:
+            miss_vectors = self.embeddings.embed_documents(list(misses.values()))
+            computed = dict(zip(misses.keys(), miss_vectors))
+            for key, vector in computed.items():
+                self._vec_cache[key] = vector
+            vectors = [
+                vector if vector is not None else computed[key]
+                for key, vector in zip(keys, vectors)
+            ]
+
+        return vectors
+
+    def _doc_id(self, pdf_path: str) -> str:
+        """
+        Compute a content hash identifying a PDF document regardless of its file name.
+
+        Args:
+            pdf_path (str): Path to the PDF document
+
+        Returns:
+            str: Hex-encoded 16-byte BLAKE2b digest of the file's bytes
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        with open(pdf_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _indexed_doc_ids(self, client, doc_ids: list[str]) -> set[str]:
+        """
+        Find which documents are already fully stored in the collection.
+
+        A document only counts as stored once its last chunk, which carries the
+        `doc_complete` marker, has been upserted. Chunks are upserted in order, so a
+        CV whose upload failed part-way is reported as not stored.
+
+        Args:
+            client: Qdrant client connected to the server
+            doc_ids (list[str]): Content hashes of the documents to look up
+
+        Returns:
+            set[str]: The subset of `doc_ids` that is fully stored
+        """
+        points, _ = client.scroll(
+            collection_name=self.collection_name,
+            scroll_filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="metadata.doc_id",
+                        match=models.MatchAny(any=doc_ids),
+                    ),
+                    models.FieldCondition(
+                        key="metadata.doc_complete",
+                        match=models.MatchValue(value=True),
+                    ),
+                ]
+            ),
+            limit=len(doc_ids),
+            with_payload=["metadata"],
+            with_vectors=False,
+        )
+        return {point.payload["metadata"]["doc_id"] for point in points}
+
+    def _load_pdf(self, pdf_path: str, text: str) -> list[Document]:
+        """
+        Turn the text extracted from a PDF document into documents.
+
+        Digital PDFs use the text PyMuPDF extracted. If that text is shorter than
+        `min_text_chars` (typically a scanned CV), the document is re-loaded with
+        UnstructuredPDFLoader, which can fall back to OCR.
+
+        Args:
+            pdf_path (str): Path to the PDF document to load
+            text (str): Text extracted from the document by PyMuPDF
+
+        Returns:
+            list[Document]: The loaded documents
+        """
+        if len(text.strip()) < self.min_text_chars:
+            # Imported lazily: unstructured pulls in nltk, pdfminer and layout models
+            from langchain_community.document_loaders import UnstructuredPDFLoader
+
+            return UnstructuredPDFLoader(pdf_path).load()
+
+        return [Document(page_content=text, metadata={"source": pdf_path})]
+
+    def _load_and_split_one(self, pdf_path: str, text: str) -> tuple[list[str], list[dict]]:
+        """
+        Load a single PDF document and split it into chunks tagged with the candidate's name.
 
         Args:
             pdf_path (str): Path to the PDF document to process
+            text (str): Text extracted from the document by PyMuPDF
 
         Returns:
-            str: Success message confirming storage in Qdrant
+            tuple[list[str], list[dict]]: The text of each chunk and the matching chunk
+                metadata, which carries the candidate's name
 
         Raises:
-            FileNotFoundError: If the specified PDF file doesn't exist
             ValueError: If no documents are loaded or no text chunks are created
-            ConnectionError: If connection to Qdrant fails
         """
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"The file {pdf_path} does not exist.")
-
         # Extract the candidate's name from the file name (without extension)
         candidate_name = os.path.splitext(os.path.basename(pdf_path))[0].replace('_', ' ')
 
         # Load and preprocess the document
-        loader = UnstructuredPDFLoader(pdf_path)
-        docs = loader.load()
+        docs = self._load_pdf(pdf_path, text)
         if not docs:
-            raise ValueError("No documents were loaded from the PDF.")
+            raise ValueError(f"No documents were loaded from the PDF {pdf_path}.")
 
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000, chunk_overlap=250
+            chunk_size=600, chunk_overlap=80
         )
         splits = text_splitter.split_documents(docs)
         if not splits:
-            raise ValueError("No text chunks were created from the documents.")
-        
-        # Append candidate's name to each chunk
-        for split in splits:
-            split.page_content = f"Candidate Name is {candidate_name}\n\n{split.page_content}"
-            print(f"Chunk Content after edit :\n{split.page_content}\n{'-'*50}")  # Print the chunk content
-        # Create and store embeddings in Qdrant
+            raise ValueError(f"No text chunks were created from the PDF {pdf_path}.")
+
+        # Keep chunk text free of the candidate's name so identical sections of different
+        # CVs share one embedding; the name travels in the metadata instead
+        texts = [split.page_content for split in splits]
+        metadatas = [split.metadata | {"candidate_name": candidate_name} for split in splits]
+
+        return texts, metadatas
+
+    def load_and_split_many(
+        self,
+        pdf_paths: list[str],
+        progress_callback: Optional[Callable[[int, int, str], None]] = None,
+    ) -> list[tuple[list[str], list[dict]]]:
+        """
+        Load and split several PDF documents, extracting their text in parallel.
+
+        PyMuPDF holds the GIL and does not support multithreading, so text extraction
+        runs on a pool of up to `max_workers` spawned processes. Splitting, and the
+        Unstructured fallback for scanned CVs, then run serially in this process.
+
+        Args:
+            pdf_paths (list[str]): Paths to the PDF documents to process
+            progress_callback (Callable[[int, int, str], None], optional): Called from the
+                calling thread as `(completed, total, pdf_path)` each time a document's
+                text has been extracted.
+
+        Returns:
+            list[tuple[list[str], list[dict]]]: The chunk texts and metadata of each
+                document, in the order of `pdf_paths`
+        """
+        if not pdf_paths:
+            return []
+
+        texts = {}
+        # Spawned workers avoid forking the multithreaded Streamlit server
+        with ProcessPoolExecutor(
+            max_workers=min(self.max_workers, len(pdf_paths)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            futures = {
+                executor.submit(extract_pdf_text, pdf_path): pdf_path
+                for pdf_path in pdf_paths
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                pdf_path = futures[future]
+                texts[pdf_path] = future.result()
+                if progress_callback:
+                    progress_callback(completed, len(pdf_paths), pdf_path)
+
+        return [self._load_and_split_one(pdf_path, texts[pdf_path]) for pdf_path in pdf_paths]
+
+    def create_embeddings(
+        self,
+        pdf_paths: list[str],
+        progress_callback: Optional[Callable[[float, str], None]] = None,
+    ) -> int:
+        """
+        Process a batch of PDF documents, create embeddings, and store them in Qdrant.
+
+        This method performs the following steps:
+        1. Validates every PDF path
+        2. Skips documents whose content hash is already fully stored in the collection,
+           and removes leftover chunks of documents whose upload failed part-way
+        3. Extracts the documents' text in parallel processes and splits it, tagging
+           each chunk with the candidate's name taken from the filename
+        4. Embeds all chunks not found in the embedding cache in a single batched call
+        5. Uploads the vectors to Qdrant in batches of `upsert_batch_size`, tagging
+           every point with its document's `doc_id` and each document's last point
+           with a `doc_complete` marker
+
+        Args:
+            pdf_paths (list[str]): Paths to the PDF documents to process
+            progress_callback (Callable[[float, str], None], optional): Called as
+                `(progress, status)` with the overall progress between 0 and 1 as each
+                document is extracted, around the embedding pass, and after each upsert.
+
+        Returns:
+            int: Number of documents newly stored in Qdrant; 0 when every document
+                was already stored
+
+        Raises:
+            FileNotFoundError: If one of the specified PDF files doesn't exist
+            ValueError: If no documents are loaded or no text chunks are created
+            ConnectionError: If connection to Qdrant fails
+        """
+        for pdf_path in pdf_paths:
+            if not os.path.exists(pdf_path):
+                raise FileNotFoundError(f"The file {pdf_path} does not exist.")
+
+        # Keep one path per distinct document, then drop documents already indexed
+        doc_ids = {}
+        for pdf_path in pdf_paths:
+            doc_id = self._doc_id(pdf_path)
+            if doc_id not in doc_ids.values():
+                doc_ids[pdf_path] = doc_id
+
         try:
-            qdrant = Qdrant.from_documents(
-                splits,
-                self.embeddings,
-                url=self.qdrant_url,
-                prefer_grpc=False,
-                collection_name=self.collection_name,
+            client = get_qdrant_client(self.qdrant_url)
+            if client.collection_exists(self.collection_name):
+                indexed = self._indexed_doc_ids(client, list(doc_ids.values()))
+                doc_ids = {
+                    pdf_path: doc_id
+                    for pdf_path, doc_id in doc_ids.items()
+                    if doc_id not in indexed
+                }
+                if doc_ids:
+                    # Drop chunks left behind by earlier, partially failed uploads
+                    client.delete(
+                        collection_name=self.collection_name,
+                        points_selector=models.FilterSelector(
+                            filter=models.Filter(
+                                must=[
+                                    models.FieldCondition(
+                                        key="metadata.doc_id",
+                                        match=models.MatchAny(any=list(doc_ids.values())),
+                                    )
+                                ]
+                            )
+                        ),
+                    )
+        except Exception as e:
+            raise ConnectionError(f"Failed to connect to Qdrant: {e}")
+
+        if not doc_ids:
+            return 0
+
+        def report(progress: float, status: str):
+            if progress_callback:
+                progress_callback(progress, status)
+
+        def report_extracted(completed: int, total: int, pdf_path: str):
+            report(
+                self.EXTRACT_PROGRESS * completed / total,
+                f"Extracted: {os.path.basename(pdf_path)}",
             )
+
+        pdf_paths = list(doc_ids)
+        texts, metadatas = [], []
+        for pdf_path, (doc_texts, doc_metadatas) in zip(
+            pdf_paths, self.load_and_split_many(pdf_paths, report_extracted)
+        ):
+            doc_metadatas = [
+                metadata | {"doc_id": doc_ids[pdf_path]} for metadata in doc_metadatas
+            ]
+            # Points are upserted in order, so the last chunk marks the whole CV as stored
+            doc_metadatas[-1] = doc_metadatas[-1] | {"doc_complete": True}
+            texts.extend(doc_texts)
+            metadatas.extend(doc_metadatas)
+        if not texts:
+            raise ValueError("No text chunks were created from the documents.")
+
+        # Embed every uncached chunk of every CV in one batched pass
+        report(self.EXTRACT_PROGRESS, f"Embedding {len(texts)} chunks...")
+        vectors = self._embed_with_cache(texts)
+        report(self.EMBED_PROGRESS, f"Uploading {len(texts)} chunks to Qdrant...")
+
+        # Create the collection once and store embeddings in Qdrant
+        try:
+            if not client.collection_exists(self.collection_name):
+                client.create_collection(
+                    collection_name=self.collection_name,
+                    vectors_config=models.VectorParams(
+                        size=len(vectors[0]),
+                        distance=models.Distance.COSINE,
+                    ),
+                    quantization_config=self._quantization_config(),
+                )
+                client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name="metadata.doc_id",
+                    field_schema=models.PayloadSchemaType.KEYWORD,
+                )
+                client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name="metadata.doc_complete",
+                    field_schema=models.PayloadSchemaType.BOOL,
+                )
+
+            # Payload keys match the defaults read back by the langchain Qdrant store
+            points = [
+                models.PointStruct(
+                    id=uuid.uuid4().hex,
+                    vector=vector,
+                    payload={"page_content": text, "metadata": metadata},
+                )
+                for vector, text, metadata in zip(vectors, texts, metadatas)
+            ]
+            for start in range(0, len(points), self.upsert_batch_size):
+                client.upsert(
+                    collection_name=self.collection_name,
+                    points=points[start:start + self.upsert_batch_size],
+                )
+                uploaded = min(start + self.upsert_batch_size, len(points))
+                report(
+                    self.EMBED_PROGRESS + (1 - self.EMBED_PROGRESS) * uploaded / len(points),
+                    f"Uploaded {uploaded}/{len(points)} chunks to Qdrant",
+                )
         except Exception as e:
             raise ConnectionError(f"Failed to connect to Qdrant: {e}")
 
-        return "✅ Vector DB Successfully Created and Stored in Qdrant!"
-    
\ No newline at end of file
+        return len(doc_ids)